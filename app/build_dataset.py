@@ -0,0 +1,86 @@
+"""Build a training set for a feature pipeline from a labelled corpus.
+
+    python -m app.build_dataset CORPUS_DIR OUT.csv --pipeline v2 --windows 4
+
+Audio files are labelled by name, "<gender>_<age_group>_<anything>.<ext>"
+(e.g. male_fifties_06311.wav), the convention of the original corpus. Each
+file is tiled into 5-second windows exactly as /predict?windows=K does, and
+every window becomes one CSV row: file, start (seconds), gender, age_group,
+then the pipeline's feature columns in model order. Train a bundle on it and
+save it to the pipeline's model directory (models_v2/ for v2) to serve it.
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+
+from app.config import ALLOWED_EXTENSIONS
+from app.pipelines import PIPELINES, get_pipeline
+from app.utils import SAMPLE_RATE, feature_names, load_windows, summarize_descriptors
+
+logger = logging.getLogger(__name__)
+
+GENDERS = {"male", "female"}
+
+
+def corpus_files(corpus_dir):
+    """Audio files under `corpus_dir`, in a stable order."""
+    for root, _, files in sorted(os.walk(corpus_dir)):
+        for name in sorted(files):
+            if name.rsplit(".", 1)[-1].lower() in ALLOWED_EXTENSIONS:
+                yield os.path.join(root, name)
+
+
+def parse_labels(file_path):
+    """(gender, age_group) from the file name, or None if it is not labelled."""
+    parts = os.path.basename(file_path).lower().split("_")
+    if len(parts) < 3 or parts[0] not in GENDERS:
+        return None
+    return parts[0], parts[1]
+
+
+def build_dataset(corpus_dir, out_path, pipeline, windows=1):
+    """Write one feature row per window of every labelled file; returns the row count."""
+    rows = 0
+    header = None
+    with open(out_path, "w", newline="") as out:
+        writer = csv.writer(out)
+        for file_path in corpus_files(corpus_dir):
+            labels = parse_labels(file_path)
+            if labels is None:
+                logger.warning(f"⚠️ Skipping unlabelled file {file_path}")
+                continue
+            try:
+                y, starts, window_length = load_windows(file_path, windows)
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping undecodable file {file_path}: {e}")
+                continue
+
+            for start in starts:
+                descriptors = pipeline.describe(y[start:start + window_length], SAMPLE_RATE)
+                if header is None:
+                    header = feature_names(descriptors)
+                    writer.writerow(["file", "start", "gender", "age_group"] + header)
+                features = summarize_descriptors(descriptors)
+                writer.writerow([os.path.relpath(file_path, corpus_dir), start / SAMPLE_RATE, *labels]
+                                + [float(f) for f in features])
+                rows += 1
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export pipeline features for a labelled audio corpus.")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("out_path")
+    parser.add_argument("--pipeline", default="v2", choices=sorted(PIPELINES))
+    parser.add_argument("--windows", type=int, default=1, help="5-second windows per file (as /predict?windows=K)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+    rows = build_dataset(args.corpus_dir, args.out_path, get_pipeline(args.pipeline), args.windows)
+    logger.info(f"✅ Wrote {rows} rows of {args.pipeline} features to {args.out_path}")
+
+
+if __name__ == "__main__":
+    main()
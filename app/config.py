@@ -2,4 +2,30 @@ import os
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-ALLOWED_EXTENSIONS = {"wav", "mp3", "ogg", "m4a"}
\ No newline at end of file
+ALLOWED_EXTENSIONS = {"wav", "mp3", "ogg", "m4a"}
+
+# Live streaming (/stream)
+STREAM_EMIT_INTERVAL = 1.0   # seconds of analysed audio between predictions
+STREAM_IDLE_TIMEOUT = 60     # seconds before an unused stream is dropped
+STREAM_CALIBRATION_SECONDS = 5.0  # audio buffered to fix chroma tuning and MFCC level before analysis
+
+# Multi-window analysis (/predict?windows=K)
+MAX_WINDOWS = 32
+
+# Upload validation
+MAX_CONTENT_LENGTH = 25 * 1024 * 1024   # bytes; larger bodies are cut off with 413
+MIN_AUDIO_SECONDS = 0.5
+MAX_AUDIO_SECONDS = 300
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 96000
+MAX_CHANNELS = 2
+PROBE_SEGMENTS = 5                       # excerpts spread across the file for the silence check
+PROBE_SECONDS = 2                        # length of each excerpt
+SILENCE_RMS_THRESHOLD = 1e-3
+
+# Feature pipelines (see app/pipelines.py)
+DEFAULT_PIPELINE = "v1"
+SHADOW_PIPELINES = ["v2"]   # also run on /predict traffic, logged to pipeline_runs
+SHADOW_SAMPLE_RATE = 0.1    # fraction of /predict requests that get shadow runs
+SHADOW_WORKERS = 1          # background threads running shadow pipelines
+SHADOW_MAX_PENDING = 4      # shadow jobs queued or running; extras are skipped
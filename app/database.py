@@ -8,8 +8,14 @@ logger.setLevel(logging.INFO)
 
 def init_db():
     try:
-        conn = sqlite3.connect('predictions.db')
+        # No implicit transactions: the migration below is one explicit transaction
+        conn = sqlite3.connect('predictions.db', isolation_level=None)
         cursor = conn.cursor()
+        # Let admin reads run alongside prediction/feedback writes
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # Every worker runs this at import; take the write lock up front so
+        # a second worker waits and then sees the finished schema
+        cursor.execute("BEGIN IMMEDIATE")
 
         # Create predictions table
         cursor.execute('''
@@ -53,8 +59,76 @@ def init_db():
         )
         """)
 
+        # Per-pipeline results for the same prediction (served + shadow runs)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prediction_id INTEGER,
+            pipeline_version TEXT,
+            served INTEGER,
+            predicted_gender TEXT,
+            predicted_age_group TEXT,
+            gender_confidence REAL,
+            age_confidence REAL,
+            latency_ms REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (prediction_id) REFERENCES predictions(id)
+        )
+        """)
+
+        # Older databases predate predictions.user_id
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(predictions)")]
+        if "user_id" not in columns:
+            cursor.execute("ALTER TABLE predictions ADD COLUMN user_id INTEGER REFERENCES users(id)")
+
+        # Keyset pagination of reviewed feedback (newest first)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_feedback
+        ON predictions (is_correct, timestamp)
+        """)
+
+        # ✅ Feedback counts per is_correct value, kept current by triggers
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_summary (
+            is_correct INTEGER PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        cursor.execute("SELECT COUNT(*) FROM feedback_summary")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("""
+            INSERT OR IGNORE INTO feedback_summary (is_correct, count)
+            SELECT is_correct, COUNT(*) FROM predictions
+            WHERE is_correct IS NOT NULL GROUP BY is_correct
+            """)
+        # One statement per execute: executescript() would commit first
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_summary_insert
+        AFTER INSERT ON predictions WHEN NEW.is_correct IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO feedback_summary (is_correct, count) VALUES (NEW.is_correct, 0);
+            UPDATE feedback_summary SET count = count + 1 WHERE is_correct = NEW.is_correct;
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_summary_update
+        AFTER UPDATE OF is_correct ON predictions
+        WHEN OLD.is_correct IS NOT NEW.is_correct
+        BEGIN
+            UPDATE feedback_summary SET count = count - 1 WHERE is_correct = OLD.is_correct;
+            INSERT OR IGNORE INTO feedback_summary (is_correct, count) VALUES (NEW.is_correct, 0);
+            UPDATE feedback_summary SET count = count + 1 WHERE is_correct = NEW.is_correct;
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_summary_delete
+        AFTER DELETE ON predictions WHEN OLD.is_correct IS NOT NULL
+        BEGIN
+            UPDATE feedback_summary SET count = count - 1 WHERE is_correct = OLD.is_correct;
+        END
+        """)
 
-        conn.commit()
+        cursor.execute("COMMIT")
         conn.close()
         # Log success
         logger.info("✅ Database initialized with all tables.")
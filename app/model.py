@@ -12,20 +12,26 @@ logger = logging.getLogger(__name__)
 # Paths
 # ============================
 MODEL_DIR = os.path.join(os.getcwd(), "models2")
-GENDER_MODELS_PATHS = {
-    "svm": os.path.join(MODEL_DIR, "gender_model_svm.pkl"),
-    "lr": os.path.join(MODEL_DIR, "gender_model_lr.pkl"),
-}
-SCALER_GENDER_PATH = os.path.join(MODEL_DIR, "scaler.pkl")
-FEATURE_LIST_PATH = os.path.join(MODEL_DIR, "feature_list.pkl")
+MODEL_DIR_V2 = os.path.join(os.getcwd(), "models_v2")
+
 
-STEP1_MODEL_PATH = os.path.join(MODEL_DIR, "model_step1.joblib")
-STEP1_SCALER_PATH = os.path.join(MODEL_DIR, "scaler_step1.joblib")
-STEP1_ENCODER_PATH = os.path.join(MODEL_DIR, "label_encoder_step1.joblib")
+def bundle_paths(model_dir):
+    """File layout shared by every model bundle directory."""
+    return {
+        "gender_models": {
+            "svm": os.path.join(model_dir, "gender_model_svm.pkl"),
+            "lr": os.path.join(model_dir, "gender_model_lr.pkl"),
+        },
+        "scaler_gender": os.path.join(model_dir, "scaler.pkl"),
+        "feature_list": os.path.join(model_dir, "feature_list.pkl"),
+        "model_step1": os.path.join(model_dir, "model_step1.joblib"),
+        "scaler_step1": os.path.join(model_dir, "scaler_step1.joblib"),
+        "encoder_step1": os.path.join(model_dir, "label_encoder_step1.joblib"),
+        "model_step2": os.path.join(model_dir, "model_step2.joblib"),
+        "scaler_step2": os.path.join(model_dir, "scaler_step2.joblib"),
+        "encoder_step2": os.path.join(model_dir, "label_encoder_step2.joblib"),
+    }
 
-STEP2_MODEL_PATH = os.path.join(MODEL_DIR, "model_step2.joblib")
-STEP2_SCALER_PATH = os.path.join(MODEL_DIR, "scaler_step2.joblib")
-STEP2_ENCODER_PATH = os.path.join(MODEL_DIR, "label_encoder_step2.joblib")
 
 AGE_CLASS_MAP = {
     0: 'eighties',
@@ -38,42 +44,42 @@ AGE_CLASS_MAP = {
     7: 'twenties'
 }
 
-_cached_assets = None
+_cached_assets = {}
 
 # ============================
 # Model Loader
 # ============================
-def load_assets():
-    global _cached_assets
-    if _cached_assets is not None:
-        return _cached_assets
+def load_assets(model_dir=MODEL_DIR):
+    if model_dir in _cached_assets:
+        return _cached_assets[model_dir]
 
     try:
-        logger.info("🔄 Loading models and scalers...")
+        logger.info(f"🔄 Loading models and scalers from {model_dir}...")
+        paths = bundle_paths(model_dir)
 
         gender_models = {
-            name: joblib.load(path) for name, path in GENDER_MODELS_PATHS.items()
+            name: joblib.load(path) for name, path in paths["gender_models"].items()
         }
-        scaler_gender = joblib.load(SCALER_GENDER_PATH)
-        feature_list = joblib.load(FEATURE_LIST_PATH)
+        scaler_gender = joblib.load(paths["scaler_gender"])
+        feature_list = joblib.load(paths["feature_list"])
 
-        model_step1 = joblib.load(STEP1_MODEL_PATH)
-        scaler_step1 = joblib.load(STEP1_SCALER_PATH)
-        encoder_step1 = joblib.load(STEP1_ENCODER_PATH)
+        model_step1 = joblib.load(paths["model_step1"])
+        scaler_step1 = joblib.load(paths["scaler_step1"])
+        encoder_step1 = joblib.load(paths["encoder_step1"])
 
-        model_step2 = joblib.load(STEP2_MODEL_PATH)
-        scaler_step2 = joblib.load(STEP2_SCALER_PATH)
-        encoder_step2 = joblib.load(STEP2_ENCODER_PATH)
+        model_step2 = joblib.load(paths["model_step2"])
+        scaler_step2 = joblib.load(paths["scaler_step2"])
+        encoder_step2 = joblib.load(paths["encoder_step2"])
 
         logger.info("✅ All assets loaded successfully.")
 
-        _cached_assets = (
+        _cached_assets[model_dir] = (
             gender_models, scaler_gender, feature_list,
             model_step1, scaler_step1, encoder_step1,
             model_step2, scaler_step2, encoder_step2,
             AGE_CLASS_MAP
         )
-        return _cached_assets
+        return _cached_assets[model_dir]
 
     except Exception as e:
         logger.error(f"❌ Error loading assets: {e}")
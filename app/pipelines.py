@@ -0,0 +1,76 @@
+import os
+import logging
+
+import numpy as np
+
+from app.model import MODEL_DIR, MODEL_DIR_V2, bundle_paths, load_assets
+from app.utils import SAMPLE_RATE, HPSS_KERNEL, frame_descriptors, fast_frame_descriptors, summarize_descriptors
+
+logger = logging.getLogger(__name__)
+
+
+class FeaturePipeline:
+    """A versioned descriptor set and the model bundles trained on it.
+
+    `describe` maps a 1-D signal to frame-level descriptors; `model_dirs`
+    lists compatible bundle directories in order of preference. A pipeline is servable once one of them loads.
+    `context_frames` is how many neighbouring frames on each side a frame's
+    descriptors depend on, for callers that describe audio piecewise.
+    """
+
+    def __init__(self, version, describe, model_dirs, context_frames=0):
+        self.version = version
+        self.describe = describe
+        self.model_dirs = model_dirs
+        self.context_frames = context_frames
+
+    def features(self, y, starts=None, window_length=None, sr=SAMPLE_RATE):
+        """Feature vector for `y`, or one row per window when `starts` is given.
+
+        Each window is described on its own, exactly like a clip of that
+        length, so its chroma tuning and dB floors match the 5 s training
+        clips. Only audio inside the windows is analysed; `window_starts`
+        keeps their total length close to that of `y`.
+        """
+        if starts is None:
+            return summarize_descriptors(self.describe(y, sr))
+        return np.array([
+            summarize_descriptors(self.describe(y[start:start + window_length], sr))
+            for start in starts
+        ])
+
+    def bundle_dir(self):
+        for model_dir in self.model_dirs:
+            if os.path.exists(bundle_paths(model_dir)["feature_list"]):
+                return model_dir
+        return None
+
+    @property
+    def available(self):
+        return self.bundle_dir() is not None
+
+    def load(self):
+        model_dir = self.bundle_dir()
+        if model_dir is None:
+            raise FileNotFoundError(f"No model bundle for pipeline {self.version} in {self.model_dirs}")
+        return load_assets(model_dir)
+
+
+PIPELINES = {}
+
+
+def register_pipeline(pipeline):
+    PIPELINES[pipeline.version] = pipeline
+    return pipeline
+
+
+def get_pipeline(version):
+    """Look up a registered pipeline; raises KeyError for unknown versions."""
+    return PIPELINES[version]
+
+
+# v1: the original descriptors (piptrack, HPSS harmonic signal); models2/
+register_pipeline(FeaturePipeline("v1", frame_descriptors, [MODEL_DIR], context_frames=HPSS_KERNEL // 2))
+# v2: autocorrelation f0 and harmonicity ratio instead; needs its own bundle,
+# trained on features from `python -m app.build_dataset`
+register_pipeline(FeaturePipeline("v2", fast_frame_descriptors, [MODEL_DIR_V2]))
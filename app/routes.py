@@ -1,36 +1,47 @@
-from flask import Blueprint, json, render_template_string, request, jsonify, render_template, redirect, flash, session
+from flask import Blueprint, json, render_template_string, request, jsonify, render_template, redirect, flash, session, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.security import generate_password_hash, check_password_hash
 import re
-from app.utils import extract_features
-from app.model import load_assets
-from app.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS
+import csv
+import io
+from app.utils import SAMPLE_RATE, load_clip, load_windows
+from app.pipelines import PIPELINES, get_pipeline
+from app.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, STREAM_EMIT_INTERVAL, STREAM_IDLE_TIMEOUT, MAX_WINDOWS, MAX_CONTENT_LENGTH
+from app.config import DEFAULT_PIPELINE, SHADOW_PIPELINES, SHADOW_SAMPLE_RATE, SHADOW_WORKERS, SHADOW_MAX_PENDING
+from app.streaming import StreamRegistry, PCM_FORMATS
+from app.validation import UploadRejected, check_upload, check_audio
 from app.database import init_db
 import pandas as pd
+import numpy as np
 import sqlite3
 import os
 from datetime import datetime
 import logging
 import secrets
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask_dance.contrib.google import google
 from sqlalchemy.exc import IntegrityError
 
 logger = logging.getLogger(__name__)
 routes = Blueprint('routes', __name__)
 
-# Load models once
-assets_loaded = load_assets()
-(
-    GENDER_MODELS, SCALER_GENDER, FEATURE_LIST,
-    MODEL_STEP1, SCALER_STEP1, LABEL_ENCODER_STEP1,
-    MODEL_STEP2, SCALER_STEP2, LABEL_ENCODER_STEP2,
-    AGE_CLASS_MAP
-) = assets_loaded
+# Load models once (the default pipeline must be servable)
+get_pipeline(DEFAULT_PIPELINE).load()
 
-FEATURE_LIST_WITH_GENDER = ["gender"] + FEATURE_LIST 
 # Initialize database
 init_db()
 
+# Live audio streams
+STREAMS = StreamRegistry(STREAM_IDLE_TIMEOUT)
+
+# Shadow pipeline runs: a small pool, with extra jobs dropped rather than queued
+SHADOW_EXECUTOR = ThreadPoolExecutor(max_workers=SHADOW_WORKERS, thread_name_prefix="shadow")
+SHADOW_SLOTS = threading.BoundedSemaphore(SHADOW_MAX_PENDING)
+
 # -----------------------
 # Helper Functions
 # -----------------------
@@ -38,32 +49,20 @@ init_db()
 def allowed_file(filename):
     return filename.lower().endswith(tuple(ALLOWED_EXTENSIONS))
 
-# -----------------------
-# Routes
-# -----------------------
-
-@routes.route("/", methods=["GET"])
-def index():
-    return render_template("index.html")
 
+def authorize_request(cursor):
+    """Validate the X-API-KEY header and count the request against the plan.
 
-@routes.route("/home", methods=["GET"])
-def home():
-    return render_template("home.html")
-
-@routes.route("/predict", methods=["POST"])
-def predict():
+    Returns (user_id, None) on success or (None, error_response).
+    """
     api_key = request.headers.get("X-API-KEY")
     if not api_key:
-        return jsonify({"error": "Missing API key"}), 401
+        return None, (jsonify({"error": "Missing API key"}), 401)
 
-    conn = sqlite3.connect("predictions.db")
-    cursor = conn.cursor()
     cursor.execute("SELECT id, plan FROM users WHERE api_key = ?", (api_key,))
     user = cursor.fetchone()
     if not user:
-        conn.close()
-        return jsonify({"error": "Invalid API key"}), 403
+        return None, (jsonify({"error": "Invalid API key"}), 403)
 
     user_id, plan = user
     today = datetime.now().strftime('%Y-%m-%d')
@@ -72,18 +71,230 @@ def predict():
 
     if plan == "free":
         if row and row[0] >= 5:
-            conn.close()
-            return jsonify({"error": "Free plan limit reached (5/day)"}), 429
+            return None, (jsonify({"error": "Free plan limit reached (5/day)"}), 429)
         elif row:
             cursor.execute("UPDATE usage SET request_count = request_count + 1 WHERE user_id=? AND date=?", (user_id, today))
         else:
             cursor.execute("INSERT INTO usage (user_id, date, request_count) VALUES (?, ?, 1)", (user_id, today))
 
+    return user_id, None
+
+
+def lookup_api_key():
+    """Return the user id for the X-API-KEY header without counting usage."""
+    api_key = request.headers.get("X-API-KEY")
+    if not api_key:
+        return None
+    conn = sqlite3.connect("predictions.db")
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM users WHERE api_key = ?", (api_key,))
+    user = cursor.fetchone()
+    conn.close()
+    return user[0] if user else None
+
+
+def predict_batch(feature_matrix, pipeline=None):
+    """Run the gender -> age cascade on a (rows x features) matrix in one call.
+
+    Uses the model bundle of `pipeline` (default: DEFAULT_PIPELINE). Returns
+    one (gender, gender_confidence, age_group, age_confidence, features)
+    tuple per row, where the returned features have the predicted gender
+    prepended.
+    """
+    (
+        GENDER_MODELS, SCALER_GENDER, FEATURE_LIST,
+        MODEL_STEP1, SCALER_STEP1, LABEL_ENCODER_STEP1,
+        MODEL_STEP2, SCALER_STEP2, LABEL_ENCODER_STEP2,
+        AGE_CLASS_MAP
+    ) = (pipeline or get_pipeline(DEFAULT_PIPELINE)).load()
+
+    features_df = pd.DataFrame(np.asarray(feature_matrix, dtype=float), columns=FEATURE_LIST)
+    features_scaled_gender = SCALER_GENDER.transform(features_df)
+
+    # Per row, keep the prediction of whichever gender model is most confident
+    preds, confs = [], []
+    for name, model in GENDER_MODELS.items():
+        preds.append(model.predict(features_scaled_gender))
+        confs.append(model.predict_proba(features_scaled_gender).max(axis=1) * 100)
+    preds, confs = np.array(preds), np.array(confs)
+    best = confs.argmax(axis=0)
+    rows = np.arange(len(features_df))
+    best_preds, best_confs = preds[best, rows], confs[best, rows]
+
+    # Insert gender first, with correct feature order for age prediction
+    features_df.insert(0, "gender", best_preds.astype(float))
+    age_df = features_df[SCALER_STEP1.feature_names_in_]
+
+    features_scaled_step1 = SCALER_STEP1.transform(age_df)
+    step1_preds = LABEL_ENCODER_STEP1.inverse_transform(MODEL_STEP1.predict(features_scaled_step1))
+    age_groups = np.empty(len(rows), dtype=object)
+    age_confidences = MODEL_STEP1.predict_proba(features_scaled_step1).max(axis=1) * 100
+
+    child = step1_preds == 'child'
+    age_groups[child] = 'child'
+    if not child.all():
+        features_scaled_step2 = SCALER_STEP2.transform(age_df[~child])
+        step2_preds_encoded = MODEL_STEP2.predict(features_scaled_step2)
+        step2_labels = np.array([AGE_CLASS_MAP.get(encoded) for encoded in step2_preds_encoded], dtype=object)
+        # Only codes missing from the map go through the encoder, as before
+        unmapped = np.array([label is None for label in step2_labels], dtype=bool)
+        if unmapped.any():
+            step2_labels[unmapped] = LABEL_ENCODER_STEP2.inverse_transform(step2_preds_encoded[unmapped])
+        age_groups[~child] = step2_labels
+        age_confidences[~child] = MODEL_STEP2.predict_proba(features_scaled_step2).max(axis=1) * 100
+
+    return [
+        (
+            "Female" if best_preds[i] == 1 else "Male", float(best_confs[i]),
+            age_groups[i], float(age_confidences[i]),
+            features_df.iloc[i].tolist()
+        )
+        for i in rows
+    ]
+
+
+def predict_from_features(features, pipeline=None):
+    """Run the gender -> age cascade on one feature vector."""
+    return predict_batch([features], pipeline)[0]
+
+
+def aggregate_window_predictions(results):
+    """Confidence-weighted vote over per-window (label, confidence) pairs.
+
+    Returns the winning label and its summed confidence divided by the number
+    of windows, i.e. 100 only if every window agrees with full confidence.
+    """
+    votes = {}
+    for label, confidence in results:
+        votes[label] = votes.get(label, 0.0) + confidence
+    label = max(votes, key=votes.get)
+    return label, votes[label] / len(results)
+
+
+def combine_results(results):
+    """Collapse per-window cascade results into one (vote, mean features)."""
+    if len(results) == 1:
+        return results[0]
+    gender, gender_conf = aggregate_window_predictions([(r[0], r[1]) for r in results])
+    age_group, age_conf = aggregate_window_predictions([(r[2], r[3]) for r in results])
+    features = np.mean([r[4] for r in results], axis=0).tolist()
+    return gender, gender_conf, age_group, age_conf, features
+
+
+def run_pipeline(pipeline, y, starts=None, window_length=None):
+    """Describe a clip (or the windows of a recording) and run the cascade.
+
+    Returns (per-row results, milliseconds spent on features + models).
+    """
+    started = time.perf_counter()
+    features = np.atleast_2d(pipeline.features(y, starts, window_length))
+    results = predict_batch(features, pipeline)
+    return results, (time.perf_counter() - started) * 1000
+
+
+def record_pipeline_run(cursor, prediction_id, version, served, result, latency_ms):
+    gender, gender_conf, age_group, age_conf, _ = result
+    cursor.execute("""
+        INSERT INTO pipeline_runs (
+            prediction_id, pipeline_version, served, predicted_gender,
+            predicted_age_group, gender_confidence, age_confidence, latency_ms
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (prediction_id, version, int(served), gender, age_group, gender_conf, age_conf, latency_ms))
+
+
+def start_shadow_runs(prediction_id, served_version, y, starts=None, window_length=None):
+    """Run SHADOW_PIPELINES on the clip that was just served, off the request thread.
+
+    Only a SHADOW_SAMPLE_RATE fraction of requests is shadowed, and when
+    SHADOW_MAX_PENDING jobs are already waiting the request is skipped.
+    """
+    shadows = [
+        PIPELINES[v] for v in SHADOW_PIPELINES
+        if v != served_version and v in PIPELINES and PIPELINES[v].available
+    ]
+    if not shadows or random.random() >= SHADOW_SAMPLE_RATE:
+        return
+    if not SHADOW_SLOTS.acquire(blocking=False):
+        logger.info(f"Shadow queue full, skipping prediction {prediction_id}")
+        return
+
+    def run():
+        try:
+            conn = sqlite3.connect("predictions.db")
+            cursor = conn.cursor()
+            for pipeline in shadows:
+                try:
+                    results, latency_ms = run_pipeline(pipeline, y, starts, window_length)
+                    record_pipeline_run(cursor, prediction_id, pipeline.version, False,
+                                        combine_results(results), latency_ms)
+                except Exception as e:
+                    logger.error(f"Shadow pipeline {pipeline.version} failed: {str(e)}", exc_info=True)
+            conn.commit()
+            conn.close()
+        finally:
+            SHADOW_SLOTS.release()
+
+    SHADOW_EXECUTOR.submit(run)
+
+# -----------------------
+# Routes
+# -----------------------
+
+@routes.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"error": f"Upload too large (maximum {MAX_CONTENT_LENGTH // (1024 * 1024)} MB)"}), 413
+
+
+@routes.route("/", methods=["GET"])
+def index():
+    return render_template("index.html")
+
+
+@routes.route("/home", methods=["GET"])
+def home():
+    return render_template("home.html")
+
+@routes.route("/predict", methods=["POST"])
+def predict():
+    conn = sqlite3.connect("predictions.db")
+    cursor = conn.cursor()
+    user_id, error = authorize_request(cursor)
+    if error:
+        conn.close()
+        return error
+
+    # Refuse oversized bodies from the headers, before reading any of it
+    if request.content_length and request.content_length > MAX_CONTENT_LENGTH:
+        conn.close()
+        raise RequestEntityTooLarge()
+
     file = request.files.get("audio")
     if not file or not allowed_file(file.filename):
         conn.close()
         return jsonify({"error": "No valid file uploaded"}), 400
 
+    try:
+        check_upload(file)
+    except UploadRejected as e:
+        conn.close()
+        return jsonify({"error": e.message}), e.status
+
+    pipeline_version = request.values.get("pipeline", DEFAULT_PIPELINE)
+    if pipeline_version not in PIPELINES:
+        conn.close()
+        return jsonify({"error": f"Unknown pipeline, use one of {sorted(PIPELINES)}"}), 400
+    pipeline = get_pipeline(pipeline_version)
+    if not pipeline.available:
+        conn.close()
+        return jsonify({"error": f"Pipeline {pipeline_version} has no model bundle deployed"}), 503
+
+    windows = request.values.get("windows")
+    if windows is not None:
+        if not windows.isdigit() or not 1 <= int(windows) <= MAX_WINDOWS:
+            conn.close()
+            return jsonify({"error": f"windows must be an integer between 1 and {MAX_WINDOWS}"}), 400
+        windows = int(windows)
+
     filename = secure_filename(file.filename)
     filepath = os.path.join(UPLOAD_FOLDER, filename)
     
@@ -91,45 +302,39 @@ def predict():
     file.save(filepath)
     
     try:
-        features = extract_features(filepath)
-        if features is None:
+        check_audio(filepath)
+    except UploadRejected as e:
+        conn.close()
+        os.remove(filepath)
+        return jsonify({"error": e.message}), e.status
+
+    try:
+        window_results = None
+        try:
+            if windows is None:
+                y, starts, window_length = load_clip(filepath), None, None
+            else:
+                y, starts, window_length = load_windows(filepath, windows)
+        except Exception as e:
+            logger.error(f"Failed to load {filepath}: {str(e)}")
             conn.close()
             os.remove(filepath)  # Clean up file
             return jsonify({"error": "Failed to extract features"}), 500
 
-        features_df = pd.DataFrame([features], columns=FEATURE_LIST)
-        features_scaled_gender = SCALER_GENDER.transform(features_df)
-
-        best_model, best_pred, best_conf = None, None, 0
-        for name, model in GENDER_MODELS.items():
-            pred = model.predict(features_scaled_gender)[0]
-            conf = model.predict_proba(features_scaled_gender)[0].max() * 100
-            if conf > best_conf:
-                best_model, best_pred, best_conf = name, pred, conf
-
-        gender = "Female" if best_pred == 1 else "Male"
-        features = [float(best_pred)] + features  # Insert gender first
-
-        # Create fresh DataFrame with correct feature order for age prediction
-        features_df = pd.DataFrame([features], columns=FEATURE_LIST_WITH_GENDER)
-
-        features_df = features_df[SCALER_STEP1.feature_names_in_]
-        logger.info(SCALER_STEP1.feature_names_in_)
-        logger.info(features_df.columns.tolist())
-
-        features_scaled_step1 = SCALER_STEP1.transform(features_df)
-        step1_pred_encoded = MODEL_STEP1.predict(features_scaled_step1)[0]
-        step1_pred = LABEL_ENCODER_STEP1.inverse_transform([step1_pred_encoded])[0]
-
-        if step1_pred == 'child':
-            age_group = 'child'
-            age_confidence = MODEL_STEP1.predict_proba(features_scaled_step1)[0].max() * 100
-        else:
-            features_scaled_step2 = SCALER_STEP2.transform(features_df)
-            step2_pred_encoded = MODEL_STEP2.predict(features_scaled_step2)[0]
-            mapped_label = AGE_CLASS_MAP.get(step2_pred_encoded)
-            age_group = mapped_label if mapped_label else LABEL_ENCODER_STEP2.inverse_transform([step2_pred_encoded])[0]
-            age_confidence = MODEL_STEP2.predict_proba(features_scaled_step2)[0].max() * 100
+        # All windows share one descriptor pass and one model cascade call
+        results, latency_ms = run_pipeline(pipeline, y, starts, window_length)
+        gender, best_conf, age_group, age_confidence, features = combine_results(results)
+        if windows is not None:
+            window_results = [
+                {
+                    "start": start / SAMPLE_RATE,
+                    "gender": r[0],
+                    "gender_confidence": r[1],
+                    "age_group": r[2],
+                    "age_confidence": r[3]
+                }
+                for start, r in zip(starts, results)
+            ]
 
         logger.info(f"Prediction: {gender} ({best_conf:.2f}%), Age group: {age_group} ({age_confidence:.2f}%)")
 
@@ -137,16 +342,19 @@ def predict():
             INSERT INTO predictions (
                 audio_file, predicted_gender, predicted_age_group,
                 confidence_score, gender_confidence, age_confidence,
-                is_correct, features
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                is_correct, features, user_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             filename, gender, age_group,
             age_confidence, best_conf, age_confidence,
-            -1, json.dumps([float(f) for f in features])
+            -1, json.dumps([float(f) for f in features]), user_id
         ))
         prediction_id = cursor.lastrowid
+        record_pipeline_run(cursor, prediction_id, pipeline.version, True,
+                            (gender, best_conf, age_group, age_confidence, features), latency_ms)
         conn.commit()
         conn.close()
+        start_shadow_runs(prediction_id, pipeline.version, y, starts, window_length)
 
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}", exc_info=True)
@@ -162,13 +370,105 @@ def predict():
         except Exception as e:
             logger.error(f"Failed to delete file {filepath}: {str(e)}")
 
-    return jsonify({
+    response = {
         "id": prediction_id,
         "gender": gender,
         "gender_confidence": best_conf,
         "age_group": age_group,
-        "age_confidence": age_confidence
-    })
+        "age_confidence": age_confidence,
+        "pipeline": pipeline.version
+    }
+    if window_results is not None:
+        response["windows"] = window_results
+    return jsonify(response)
+
+@routes.route("/stream", methods=["POST"])
+def stream_open():
+    conn = sqlite3.connect("predictions.db")
+    cursor = conn.cursor()
+    user_id, error = authorize_request(cursor)
+    if error:
+        conn.close()
+        return error
+    conn.commit()
+    conn.close()
+
+    pipeline_version = request.args.get("pipeline", DEFAULT_PIPELINE)
+    if pipeline_version not in PIPELINES:
+        return jsonify({"error": f"Unknown pipeline, use one of {sorted(PIPELINES)}"}), 400
+    if not PIPELINES[pipeline_version].available:
+        return jsonify({"error": f"Pipeline {pipeline_version} has no model bundle deployed"}), 503
+
+    pcm_format = request.args.get("format", "s16le")
+    if pcm_format not in PCM_FORMATS:
+        return jsonify({"error": f"Unsupported format, use one of {sorted(PCM_FORMATS)}"}), 400
+    try:
+        emit_interval = float(request.args.get("interval", STREAM_EMIT_INTERVAL))
+    except ValueError:
+        return jsonify({"error": "interval must be a number of seconds"}), 400
+    if emit_interval <= 0:
+        return jsonify({"error": "interval must be positive"}), 400
+
+    stream = STREAMS.open(user_id, pcm_format, emit_interval, get_pipeline(pipeline_version))
+    return jsonify({
+        "stream_id": stream.id,
+        "pipeline": pipeline_version,
+        "format": pcm_format,
+        "sample_rate": stream.extractor.sr,
+        "interval": emit_interval
+    }), 201
+
+
+def stream_prediction(stream):
+    features = stream.extractor.feature_vector()
+    if features is None:
+        return None
+    gender, gender_conf, age_group, age_conf, _ = predict_from_features(features, stream.pipeline)
+    return {
+        "gender": gender,
+        "gender_confidence": gender_conf,
+        "age_group": age_group,
+        "age_confidence": age_conf
+    }
+
+
+@routes.route("/stream/<stream_id>", methods=["POST"])
+def stream_chunk(stream_id):
+    stream = STREAMS.get(stream_id, lookup_api_key())
+    if stream is None:
+        return jsonify({"error": "Unknown or expired stream"}), 404
+
+    try:
+        with stream.lock:
+            samples = stream.decode(request.get_data(cache=False))
+            stream.extractor.push(samples)
+            prediction = stream_prediction(stream) if stream.due() else None
+            seconds = stream.extractor.seconds
+    except Exception as e:
+        logger.error(f"Stream error: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+    return jsonify({"stream_id": stream_id, "seconds": seconds, "prediction": prediction})
+
+
+@routes.route("/stream/<stream_id>", methods=["DELETE"])
+def stream_close(stream_id):
+    stream = STREAMS.get(stream_id, lookup_api_key())
+    if stream is None:
+        return jsonify({"error": "Unknown or expired stream"}), 404
+    STREAMS.close(stream_id)
+
+    try:
+        with stream.lock:
+            stream.extractor.flush()
+            prediction = stream_prediction(stream)
+            seconds = stream.extractor.seconds
+    except Exception as e:
+        logger.error(f"Stream error: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+    return jsonify({"stream_id": stream_id, "seconds": seconds, "prediction": prediction})
+
 
 @routes.route("/feedback", methods=["POST"])
 def feedback_submit():
@@ -209,24 +509,111 @@ def feedback_form():
     return render_template("feedback.html", prediction_id=prediction_id)
 
 
+FEEDBACK_COLUMNS = [
+    "id", "audio_file", "predicted_gender", "predicted_age_group",
+    "is_correct", "corrected_gender", "corrected_age_group",
+    "user_feedback", "timestamp"
+]
+FEEDBACK_PAGE_SIZE = 50
+
+
+def feedback_filters(args):
+    """SQL conditions and parameters for the admin feedback filters."""
+    conditions, params = [], []
+    if args.get("from"):
+        conditions.append("timestamp >= ?")
+        params.append(args["from"])
+    if args.get("to"):
+        conditions.append("timestamp < date(?, '+1 day')")
+        params.append(args["to"])
+    if args.get("plan"):
+        conditions.append("user_id IN (SELECT id FROM users WHERE plan = ?)")
+        params.append(args["plan"])
+    if args.get("corrected_gender"):
+        conditions.append("corrected_gender = ?")
+        params.append(args["corrected_gender"])
+    if args.get("corrected_age_group"):
+        conditions.append("corrected_age_group = ?")
+        params.append(args["corrected_age_group"])
+    return conditions, params
+
+
+def feedback_page(cursor, args, limit):
+    """One page of reviewed feedback, newest first, using keyset pagination.
+
+    Each is_correct value walks idx_predictions_feedback in timestamp order
+    and the two short runs are merged, so no page needs a full sort.
+    """
+    conditions, params = feedback_filters(args)
+    if args.get("before_ts") and args.get("before_id"):
+        conditions.append("(timestamp, id) < (?, ?)")
+        params += [args["before_ts"], int(args["before_id"])]
+    where = "".join(f" AND {c}" for c in conditions)
+
+    columns = ", ".join(FEEDBACK_COLUMNS)
+    subquery = f"""
+        SELECT * FROM (
+            SELECT {columns} FROM predictions
+            WHERE is_correct = ?{where}
+            ORDER BY timestamp DESC, id DESC LIMIT ?
+        )"""
+    cursor.execute(
+        f"{subquery} UNION ALL {subquery} ORDER BY timestamp DESC, id DESC LIMIT ?",
+        [0, *params, limit, 1, *params, limit, limit]
+    )
+    return cursor.fetchall()
+
+
 @routes.route("/admin/view-feedback", methods=["GET"])
 def view_feedback():
+    try:
+        limit = int(request.args.get("limit", FEEDBACK_PAGE_SIZE))
+        if request.args.get("before_id"):
+            int(request.args["before_id"])
+    except ValueError:
+        return "limit and before_id must be integers", 400
+    limit = max(1, min(limit, 500))
+
     try:
         conn = sqlite3.connect("predictions.db")
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, audio_file, predicted_gender, predicted_age_group,
-                   is_correct, corrected_gender, corrected_age_group, 
-                   user_feedback, timestamp 
-            FROM predictions
-            WHERE is_correct != -1
-            ORDER BY timestamp DESC
-        """)
-        feedback_data = cursor.fetchall()
+        feedback_data = feedback_page(cursor, request.args, limit + 1)
+        cursor.execute("SELECT is_correct, count FROM feedback_summary WHERE is_correct IN (0, 1)")
+        counts = dict(cursor.fetchall())
         conn.close()
 
+        next_url = None
+        if len(feedback_data) > limit:
+            feedback_data = feedback_data[:limit]
+            last = feedback_data[-1]
+            args = request.args.to_dict()
+            args.update(before_ts=last[-1], before_id=last[0])
+            next_url = url_for("routes.view_feedback", **args)
+
+        correct, incorrect = counts.get(1, 0), counts.get(0, 0)
+        reviewed = correct + incorrect
+        summary = {
+            "reviewed": reviewed,
+            "correct": correct,
+            "incorrect": incorrect,
+            "accuracy": f"{correct / reviewed * 100:.1f}%" if reviewed else "n/a"
+        }
+
         html_template = """
         <h2>📋 Feedback Submissions</h2>
+        <p>
+            Reviewed: {{ summary.reviewed }} &middot; Correct: {{ summary.correct }}
+            &middot; Incorrect: {{ summary.incorrect }} &middot; Accuracy: {{ summary.accuracy }}
+        </p>
+        <form method="get">
+            From <input type="date" name="from" value="{{ args.get('from', '') }}">
+            To <input type="date" name="to" value="{{ args.get('to', '') }}">
+            Plan <input name="plan" value="{{ args.get('plan', '') }}" size="6">
+            Corrected gender <input name="corrected_gender" value="{{ args.get('corrected_gender', '') }}" size="8">
+            Corrected age <input name="corrected_age_group" value="{{ args.get('corrected_age_group', '') }}" size="8">
+            <button type="submit">Filter</button>
+            <a href="{{ url_for('routes.export_feedback', **export_args) }}">⬇ CSV</a>
+        </form>
         <table border="1" cellpadding="8">
             <tr>
                 <th>ID</th><th>Audio</th><th>Gender</th><th>Age</th><th>Correct?</th>
@@ -240,13 +627,96 @@ def view_feedback():
             </tr>
             {% endfor %}
         </table>
+        {% if next_url %}<p><a href="{{ next_url }}">Older →</a></p>{% endif %}
         """
-        return render_template_string(html_template, data=feedback_data)
+        export_args = {k: v for k, v in request.args.items() if k not in ("before_ts", "before_id", "limit")}
+        return render_template_string(
+            html_template, data=feedback_data, summary=summary,
+            args=request.args, export_args=export_args, next_url=next_url
+        )
     except Exception as e:
         logger.error(f"Error loading feedback: {str(e)}")
         return "Failed to load feedback", 500
 
 
+@routes.route("/admin/feedback.csv", methods=["GET"])
+def export_feedback():
+    conditions, params = feedback_filters(request.args)
+    where = "".join(f" AND {c}" for c in conditions)
+
+    def generate():
+        # Rows are stepped out of SQLite one at a time. The unary + keeps the
+        # planner off idx_predictions_feedback, so it scans in rowid order
+        # instead of collecting and sorting every match first.
+        conn = sqlite3.connect("predictions.db")
+        try:
+            cursor = conn.execute(
+                f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM predictions "
+                f"WHERE +is_correct IN (0, 1){where} ORDER BY id",
+                params
+            )
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(FEEDBACK_COLUMNS)
+            for row in cursor:
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            yield buffer.getvalue()
+        finally:
+            conn.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=feedback.csv"}
+    )
+
+
+
+@routes.route("/admin/pipelines", methods=["GET"])
+def compare_pipelines():
+    """Latency and reviewed accuracy per feature pipeline on shared traffic."""
+    try:
+        conn = sqlite3.connect("predictions.db")
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT r.pipeline_version, COUNT(*), SUM(r.served), AVG(r.latency_ms),
+                   SUM(truth.gender IS NOT NULL), SUM(r.predicted_gender = truth.gender),
+                   SUM(truth.age IS NOT NULL), SUM(r.predicted_age_group = truth.age)
+            FROM pipeline_runs r
+            LEFT JOIN (
+                -- feedback.html sends "" for labels left unchanged
+                SELECT id,
+                       COALESCE(NULLIF(corrected_gender, ''), predicted_gender) AS gender,
+                       COALESCE(NULLIF(corrected_age_group, ''), predicted_age_group) AS age
+                FROM predictions
+                WHERE is_correct IN (0, 1)
+            ) truth ON truth.id = r.prediction_id
+            GROUP BY r.pipeline_version
+        """)
+        rows = cursor.fetchall()
+        conn.close()
+    except Exception as e:
+        logger.error(f"Error comparing pipelines: {str(e)}")
+        return jsonify({"error": "Failed to compare pipelines"}), 500
+
+    def accuracy(correct, total):
+        return round(correct / total * 100, 2) if total else None
+
+    return jsonify({
+        version: {
+            "available": version in PIPELINES and PIPELINES[version].available,
+            "runs": runs,
+            "served": served,
+            "avg_latency_ms": round(latency, 2) if latency is not None else None,
+            "gender_accuracy": accuracy(gender_correct or 0, gender_total or 0),
+            "age_accuracy": accuracy(age_correct or 0, age_total or 0),
+        }
+        for version, runs, served, latency, gender_total, gender_correct, age_total, age_correct in rows
+    })
+
 
 @routes.route("/api-docs", methods=["GET"])
 def api_docs():
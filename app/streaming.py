@@ -0,0 +1,208 @@
+import threading
+import time
+import uuid
+import logging
+
+import numpy as np
+
+from app.config import STREAM_CALIBRATION_SECONDS
+from app.utils import (
+    SAMPLE_RATE, N_FFT, HOP_LENGTH, SAMPLE_DESCRIPTORS, frame_descriptors, aggregate_descriptors,
+    observations, calibrate
+)
+
+logger = logging.getLogger(__name__)
+
+# Supported raw PCM encodings for incoming chunks (little-endian, mono)
+PCM_FORMATS = {
+    "s16le": (np.dtype("<i2"), 32768.0),
+    "f32le": (np.dtype("<f4"), 1.0),
+}
+
+
+class RunningStats:
+    """Per-row running mean/std over the columns of 2-D blocks.
+
+    Blocks are merged with Chan's parallel update, so each update costs
+    O(block) regardless of how much has been seen before.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+
+    def update(self, block):
+        if self.mean is None:
+            self.mean = np.zeros(block.shape[0])
+            self.m2 = np.zeros(block.shape[0])
+        # NaN columns are missing observations (e.g. unvoiced f0 frames)
+        block = block[:, ~np.isnan(block).any(axis=0)].astype(np.float64)
+        n = block.shape[1]
+        if n == 0:
+            return
+        block_mean = block.mean(axis=1)
+        block_m2 = ((block - block_mean[:, None]) ** 2).sum(axis=1)
+
+        if self.count == 0:
+            self.count, self.mean, self.m2 = n, block_mean, block_m2
+            return
+
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + block_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+
+class StreamingFeatureExtractor:
+    """Incremental version of `FeaturePipeline.features` for live PCM audio.
+
+    Frames are uncentered and counted from the start of the stream. A frame
+    is analysed once `context` further frames have arrived, inside a block
+    that also holds `context` frames before it (plus the frames overlapping
+    its harmonic samples), so descriptors that look at neighbouring frames,
+    like the HPSS median filter, see the same input whatever the chunk
+    sizes. Frames are analysed in blocks of at least 2 * `context`, and only
+    the audio of the next block is kept between chunks, so the cost of a
+    push depends on the chunk size, not on the audio received so far.
+
+    Chroma tuning and the MFCC dB peak are calibrated once, from the first
+    `calibration_seconds` of the stream (nothing is analysed before then),
+    and reused for every block. `flush` analyses the frames still waiting
+    for context when the stream ends.
+    """
+
+    def __init__(self, sr=SAMPLE_RATE, describe=frame_descriptors, context=0,
+                 calibration_seconds=STREAM_CALIBRATION_SECONDS):
+        self.sr = sr
+        self.describe = describe
+        self.context = context
+        self.calibration_samples = max(int(calibration_seconds * sr), N_FFT)
+        self.calibration = None
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.offset = 0  # stream sample index of tail[0]
+        self.stats = {}
+        self.frames = 0
+
+    def push(self, samples, final=False):
+        """Add float samples; returns the number of newly analysed frames."""
+        buf = np.concatenate([self.tail, samples.astype(np.float32)])
+        if self.calibration is None and (len(buf) >= self.calibration_samples or final and len(buf) >= N_FFT):
+            self.calibration = calibrate(buf, self.sr, center=False)
+        available = 1 + (self.offset + len(buf) - N_FFT) // HOP_LENGTH
+        ready = available if final else available - self.context
+        # Wait for a block at least as long as its context on both sides, so
+        # tiny chunks do not each pay for describing the full context
+        if self.calibration is None or ready <= self.frames or not final and ready - self.frames < 2 * self.context:
+            self.tail = buf
+            return 0
+
+        # Harmonic samples of a frame also come from the frames overlapping it
+        overlap = N_FFT // HOP_LENGTH - 1
+        first = max(self.frames - overlap - self.context, 0)
+        last = min(ready + self.context, available)
+        start = first * HOP_LENGTH - self.offset
+        block = buf[start:start + (last - first - 1) * HOP_LENGTH + N_FFT]
+        descriptors = self.describe(block, self.sr, center=False, **self.calibration)
+
+        for name, value in descriptors.items():
+            if name in SAMPLE_DESCRIPTORS:
+                # Only samples fully covered by frames of this stream count
+                lo = max(self.frames, overlap) * HOP_LENGTH
+                value = value[:, lo - first * HOP_LENGTH:ready * HOP_LENGTH - first * HOP_LENGTH]
+            else:
+                value = value[:, self.frames - first:ready - first]
+            self.stats.setdefault(name, RunningStats()).update(observations(name, value))
+
+        n_frames = ready - self.frames
+        self.frames = ready
+        keep = max(ready - overlap - self.context, 0) * HOP_LENGTH
+        self.tail = buf[keep - self.offset:]
+        self.offset = keep
+        return n_frames
+
+    def flush(self):
+        """Analyse everything still held back, when the stream ends."""
+        return self.push(np.zeros(0, dtype=np.float32), final=True)
+
+    @property
+    def seconds(self):
+        return self.frames * HOP_LENGTH / self.sr
+
+    def feature_vector(self):
+        if self.frames == 0:
+            return None
+        return aggregate_descriptors(
+            {name: stats.mean for name, stats in self.stats.items()},
+            {name: stats.std for name, stats in self.stats.items()},
+        ).tolist()
+
+
+class StreamSession:
+    def __init__(self, user_id, pcm_format, emit_interval, pipeline):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.pcm_format = pcm_format
+        self.emit_interval = emit_interval
+        self.pipeline = pipeline
+        self.extractor = StreamingFeatureExtractor(describe=pipeline.describe, context=pipeline.context_frames)
+        self.last_emit = 0.0
+        self.last_seen = time.time()
+        self.remainder = b""
+        self.lock = threading.Lock()
+
+    def decode(self, data):
+        """Decode raw PCM bytes, carrying over a partial trailing sample."""
+        dtype, scale = PCM_FORMATS[self.pcm_format]
+        data = self.remainder + data
+        usable = len(data) - len(data) % dtype.itemsize
+        self.remainder = data[usable:]
+        return np.frombuffer(data[:usable], dtype=dtype).astype(np.float32) / scale
+
+    def due(self):
+        """True once `emit_interval` seconds of new audio have been analysed."""
+        if self.extractor.seconds - self.last_emit >= self.emit_interval:
+            self.last_emit = self.extractor.seconds
+            return True
+        return False
+
+
+class StreamRegistry:
+    """In-memory live stream sessions, dropped after `idle_timeout` seconds."""
+
+    def __init__(self, idle_timeout):
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def open(self, user_id, pcm_format, emit_interval, pipeline):
+        stream = StreamSession(user_id, pcm_format, emit_interval, pipeline)
+        with self._lock:
+            self._expire()
+            self._sessions[stream.id] = stream
+        logger.info(f"Opened stream {stream.id} for user {user_id}")
+        return stream
+
+    def get(self, stream_id, user_id):
+        with self._lock:
+            self._expire()
+            stream = self._sessions.get(stream_id)
+        if stream is None or stream.user_id != user_id:
+            return None
+        stream.last_seen = time.time()
+        return stream
+
+    def close(self, stream_id):
+        with self._lock:
+            return self._sessions.pop(stream_id, None)
+
+    def _expire(self):
+        cutoff = time.time() - self.idle_timeout
+        for stream_id in [s.id for s in self._sessions.values() if s.last_seen < cutoff]:
+            logger.info(f"Expiring idle stream {stream_id}")
+            del self._sessions[stream_id]
@@ -1,4 +1,5 @@
 import sys
+import warnings
 import librosa
 import numpy as np
 import sqlite3
@@ -12,56 +13,235 @@ handler.setFormatter(logging.Formatter(
     '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 ))
 
-def extract_features(file_path):
-    try:
-        print(f"🟢 Processing file: {file_path}")
-        
-        # Load audio with fixed sample rate
-        y, sr = librosa.load(file_path, sr=16000)  # Default behavior uses soundfile if installed
-        # Trim or pad audio to exactly 5 seconds
-        target_length = sr * 5
-        if len(y) > target_length:
-            start_sample = np.random.randint(0, len(y) - target_length)
-            y = y[start_sample:start_sample + target_length]
-        elif len(y) < target_length:
-            y = np.pad(y, (0, target_length - len(y)), mode='constant')
-        
-        print("✅ Audio loaded and standardized (5s, 16kHz)")
-        
-        # Extract features
-        mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-        spec_contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
-        zcr = librosa.feature.zero_crossing_rate(y)
-        rms = librosa.feature.rms(y=y)
-        centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
-        bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)
-        rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)
-        hnr = librosa.effects.harmonic(y)
-        pitches, _ = librosa.piptrack(y=y, sr=sr)
-        
-        # Aggregate features (mean + std for each feature)
-        features = {
-            "mfcc": np.concatenate([np.mean(mfcc, axis=1), np.std(mfcc, axis=1)]),
-            "chroma": np.concatenate([np.mean(chroma, axis=1), np.std(chroma, axis=1)]),
-            "spectral_contrast": np.concatenate([np.mean(spec_contrast, axis=1), np.std(spec_contrast, axis=1)]),
-            "zcr": [np.mean(zcr), np.std(zcr)],
-            "rms": [np.mean(rms), np.std(rms)],
-            "centroid": [np.mean(centroid), np.std(centroid)],
-            "bandwidth": [np.mean(bandwidth), np.std(bandwidth)],
-            "rolloff": [np.mean(rolloff), np.std(rolloff)],
-            "hnr": [np.mean(hnr), np.std(hnr)],
-            "pitch": [np.mean(pitches), np.std(pitches)]
-        }
-        
-        # Flatten all feature arrays into a single list
-        feature_vector = []
-        for value in features.values():
-            feature_vector.extend(value)
-        
-        print(f"✅ Features  successfully extracted and formatted (Total: {len(feature_vector)} features)")
-        return feature_vector
-    except Exception as e:
-        print(f"❌ Error extracting features from {file_path}: {e}")
-        return None
-    
+SAMPLE_RATE = 16000
+N_FFT = 2048
+HOP_LENGTH = 512
+TOP_DB = 80.0  # MFCC dynamic range, as librosa.power_to_db
+HPSS_KERNEL = 31  # frames in the harmonic median filter, as librosa's default
+
+# Search range for the v2 autocorrelation pitch tracker (Hz)
+F0_MIN = 60
+F0_MAX = 400
+VOICING_THRESHOLD = 0.3
+OCTAVE_COST = 0.01  # per octave of lag, favours f0 over its subharmonics
+PEAK_PROMINENCE = 0.2  # rise above the lowest shorter-lag value, rejects drifts
+
+# Descriptors summarised over all rows at once, and those observed per sample
+POOLED_DESCRIPTORS = {"pitch"}
+SAMPLE_DESCRIPTORS = {"hnr"}
+# Column prefixes that differ from the descriptor name (see feature_list.pkl)
+FEATURE_PREFIXES = {"spectral_contrast": "spec_contrast"}
+
+
+def calibrate(y, sr=SAMPLE_RATE, center=True):
+    """Chroma tuning and peak mel level (dB) that a whole pass over `y` uses.
+
+    Passing both to a describe function fixes them for audio analysed piecewise.
+    """
+    power = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH, center=center)) ** 2
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr), top_db=None)
+    return {
+        "tuning": librosa.estimate_tuning(S=power, sr=sr, bins_per_octave=12),
+        "db_peak": float(mel_db.max()),
+    }
+
+
+def _stft_descriptors(y, sr, center, tuning=None, db_peak=None):
+    """Descriptors shared by every pipeline, all derived from one STFT.
+
+    Chroma tuning and the MFCC dB floor (TOP_DB below the peak) come from
+    `y` itself unless `tuning` / `db_peak` are given, in which case every
+    frame is independent of the rest of `y`.
+    """
+    D = librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH, center=center)
+    mag = np.abs(D)
+    power = mag ** 2
+
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr), top_db=None)
+    peak = mel_db.max() if db_peak is None else db_peak
+    mfcc = librosa.feature.mfcc(S=np.maximum(mel_db, peak - TOP_DB), n_mfcc=13)
+    chroma = librosa.feature.chroma_stft(S=power, sr=sr, tuning=tuning)
+    spec_contrast = librosa.feature.spectral_contrast(S=mag, sr=sr)
+    zcr = librosa.feature.zero_crossing_rate(y, frame_length=N_FFT, hop_length=HOP_LENGTH, center=center)
+    rms = librosa.feature.rms(y=y, frame_length=N_FFT, hop_length=HOP_LENGTH, center=center)
+    centroid = librosa.feature.spectral_centroid(S=mag, sr=sr)
+    bandwidth = librosa.feature.spectral_bandwidth(S=mag, sr=sr)
+    rolloff = librosa.feature.spectral_rolloff(S=mag, sr=sr)
+
+    return D, mag, {
+        "mfcc": mfcc,
+        "chroma": chroma,
+        "spectral_contrast": spec_contrast,
+        "zcr": zcr,
+        "rms": rms,
+        "centroid": centroid,
+        "bandwidth": bandwidth,
+        "rolloff": rolloff,
+    }
+
+
+def frame_descriptors(y, sr=SAMPLE_RATE, center=True, tuning=None, db_peak=None):
+    """Frame-level descriptors of the v1 pipeline (models2/).
+
+    Returns a dict of (rows, frames) arrays whose key order is the column
+    order of models2/feature_list.pkl. "hnr" has one column per harmonic
+    sample instead of per frame, and "pitch" (the piptrack matrix) is pooled
+    into a single statistic, matching the original per-feature librosa calls.
+    The harmonic signal of a frame depends on HPSS_KERNEL // 2 frames either
+    side of it; all other descriptors are per frame.
+    """
+    D, mag, descriptors = _stft_descriptors(y, sr, center, tuning, db_peak)
+
+    # Same as librosa.effects.harmonic(y), but reusing the STFT above
+    D_harm = librosa.decompose.hpss(D, kernel_size=HPSS_KERNEL)[0]
+    hnr = librosa.istft(D_harm, n_fft=N_FFT, hop_length=HOP_LENGTH,
+                        center=center, length=len(y), dtype=y.dtype)
+    pitches, _ = librosa.piptrack(S=mag, sr=sr)
+
+    descriptors["hnr"] = hnr.reshape(1, -1)
+    descriptors["pitch"] = pitches
+    return descriptors
+
+
+def autocorrelation_pitch(y, sr=SAMPLE_RATE, center=True):
+    """Per-frame f0 and harmonicity from the autocorrelation of each frame.
+
+    Frames match the shared STFT (Hann window, N_FFT/HOP_LENGTH, same
+    centering). Each windowed frame is zero-padded to 2 * N_FFT before the
+    FFT, so the autocorrelation is linear rather than circular, and it is
+    normalised by the window's own autocorrelation (Boersma, 1993).
+    Candidates are local maxima strictly inside the F0_MIN..F0_MAX lag
+    range that rise at least PEAK_PROMINENCE above every shorter lag, ranked
+    with Boersma's octave cost; harmonicity is the height of
+    the chosen peak (0 if there is none) and f0 is NaN where it falls below
+    VOICING_THRESHOLD.
+    """
+    if center:
+        y = np.pad(y, N_FFT // 2, mode='constant')
+    window = librosa.filters.get_window("hann", N_FFT)
+    frames = librosa.util.frame(y, frame_length=N_FFT, hop_length=HOP_LENGTH) * window[:, None]
+
+    ac = np.fft.irfft(np.abs(np.fft.rfft(frames, n=2 * N_FFT, axis=0)) ** 2, axis=0)
+    window_ac = np.fft.irfft(np.abs(np.fft.rfft(window, n=2 * N_FFT)) ** 2)
+
+    lag_min, lag_max = int(sr / F0_MAX), int(sr / F0_MIN)
+    r0 = np.maximum(ac[:1], np.finfo(ac.dtype).tiny)
+    norm = (ac[:lag_max + 2] / r0) / (window_ac[:lag_max + 2, None] / window_ac[0])
+
+    # One extra lag on either side so the range ends can be compared
+    lags = norm[lag_min - 1:]
+    inner = lags[1:-1]
+    lowest_before = np.minimum.accumulate(norm, axis=0)[lag_min - 1:lag_max]
+    is_peak = (inner > lags[:-2]) & (inner >= lags[2:]) & (inner - lowest_before >= PEAK_PROMINENCE)
+    is_peak[0] = is_peak[-1] = False
+    octave_penalty = OCTAVE_COST * np.log2(F0_MIN * np.arange(lag_min, lag_max + 1) / sr)
+    candidates = np.where(is_peak, inner - octave_penalty[:, None], -np.inf)
+
+    peak = candidates.argmax(axis=0)
+    frames_idx = np.arange(candidates.shape[1])
+    harmonicity = np.where(is_peak.any(axis=0), np.clip(inner[peak, frames_idx], 0.0, 1.0), 0.0)
+    f0 = np.where(harmonicity >= VOICING_THRESHOLD, sr / (peak + lag_min), np.nan)
+    return f0[None, :], harmonicity[None, :]
+
+
+def fast_frame_descriptors(y, sr=SAMPLE_RATE, center=True, tuning=None, db_peak=None):
+    """Frame-level descriptors of the v2 pipeline.
+
+    Same as `frame_descriptors` except that piptrack and the HPSS harmonic
+    signal are replaced by an autocorrelation f0 track (voiced frames only)
+    and a per-frame harmonicity ratio.
+    """
+    D, mag, descriptors = _stft_descriptors(y, sr, center, tuning, db_peak)
+    f0, harmonicity = autocorrelation_pitch(y, sr, center)
+    descriptors["harmonicity"] = harmonicity
+    descriptors["f0"] = f0
+    return descriptors
+
+
+def aggregate_descriptors(means, stds):
+    """Concatenate per-descriptor mean/std rows into the model's feature layout.
+
+    Descriptors are taken in the order of `means`.
+    """
+    parts = []
+    for name in means:
+        parts.append(np.asarray(means[name], dtype=float))
+        parts.append(np.asarray(stds[name], dtype=float))
+    return np.concatenate(parts)
+
+
+def feature_names(descriptors):
+    """Column names of the feature vector built from `descriptors`.
+
+    Follows models2/feature_list.pkl: "mfcc_0".."mfcc_12" then
+    "mfcc_std_0".., and a bare "zcr" / "zcr_std" for single-row descriptors.
+    """
+    names = []
+    for name, value in descriptors.items():
+        prefix = FEATURE_PREFIXES.get(name, name)
+        rows = observations(name, value).shape[0]
+        if rows == 1:
+            names += [prefix, f"{prefix}_std"]
+        else:
+            names += [f"{prefix}_{i}" for i in range(rows)] + [f"{prefix}_std_{i}" for i in range(rows)]
+    return names
+
+
+def observations(name, value):
+    """A descriptor as (rows, observations), pooling POOLED_DESCRIPTORS into one row."""
+    if name in POOLED_DESCRIPTORS:
+        return value.reshape(1, -1)
+    return value
+
+
+def summarize_descriptors(descriptors):
+    """Mean/std of every descriptor over its observations, as a feature vector.
+
+    NaN observations (e.g. unvoiced f0 frames) are skipped; a descriptor with
+    none left contributes zeros.
+    """
+    descriptors = {name: observations(name, value) for name, value in descriptors.items()}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        features = aggregate_descriptors(
+            {name: np.nanmean(value, axis=-1) for name, value in descriptors.items()},
+            {name: np.nanstd(value, axis=-1) for name, value in descriptors.items()},
+        )
+    return np.nan_to_num(features)
+
+
+def window_starts(n_samples, window_length, windows):
+    """Evenly spaced window offsets tiling a recording of `n_samples`.
+
+    At most one window per `window_length` of audio is returned, so the
+    windows never add up to much more audio than the recording itself.
+    """
+    windows = min(windows, round(n_samples / window_length))
+    if windows <= 1:
+        return [0]
+    return np.linspace(0, n_samples - window_length, windows).astype(int).tolist()
+
+
+def load_clip(file_path, seconds=5):
+    """Load a random `seconds`-long, 16 kHz slice of a recording (zero-padded)."""
+    y, sr = librosa.load(file_path, sr=SAMPLE_RATE)  # Default behavior uses soundfile if installed
+    target_length = sr * seconds
+    if len(y) > target_length:
+        start_sample = np.random.randint(0, len(y) - target_length)
+        y = y[start_sample:start_sample + target_length]
+    elif len(y) < target_length:
+        y = np.pad(y, (0, target_length - len(y)), mode='constant')
+    return y
+
+
+def load_windows(file_path, windows, window_seconds=5):
+    """Load a whole recording and tile it into up to `windows` windows.
+
+    Returns (y, starts, window_length) with window starts in samples.
+    Recordings shorter than one window are zero-padded to a single window.
+    """
+    y, sr = librosa.load(file_path, sr=SAMPLE_RATE)
+    window_length = sr * window_seconds
+    if len(y) < window_length:
+        y = np.pad(y, (0, window_length - len(y)), mode='constant')
+    return y, window_starts(len(y), window_length, windows), window_length
@@ -0,0 +1,114 @@
+import logging
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from app.config import (
+    MAX_AUDIO_SECONDS, MIN_AUDIO_SECONDS, MIN_SAMPLE_RATE, MAX_SAMPLE_RATE, MAX_CHANNELS,
+    SILENCE_RMS_THRESHOLD, PROBE_SECONDS, PROBE_SEGMENTS
+)
+
+logger = logging.getLogger(__name__)
+
+# Bytes needed to recognise every supported container
+SNIFF_BYTES = 12
+
+
+class UploadRejected(Exception):
+    """An upload that failed validation; `status` is the HTTP code to return."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def sniff_container(head):
+    """Identify the audio container from its leading magic bytes."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def check_upload(file):
+    """Reject empty or non-audio uploads from the first bytes of the stream.
+
+    The container only has to be one we can decode; clients routinely send
+    e.g. MP3 data under a .wav name, which librosa handles fine.
+    """
+    head = file.stream.read(SNIFF_BYTES)
+    file.stream.seek(0)
+    if not head:
+        raise UploadRejected("Uploaded file is empty", 400)
+
+    container = sniff_container(head)
+    if container is None:
+        raise UploadRejected("File content is not a supported audio format", 415)
+    return container
+
+
+def probe_header(file_path):
+    """Read sample rate, channels and duration without decoding the audio.
+
+    Falls back to librosa (which may need to decode) for containers
+    libsndfile cannot parse, such as m4a.
+    """
+    try:
+        info = sf.info(file_path)
+        return info.samplerate, info.channels, info.duration
+    except Exception:
+        try:
+            duration = librosa.get_duration(path=file_path)
+            return None, None, duration
+        except Exception as e:
+            logger.warning(f"Undecodable upload {file_path}: {e}")
+            raise UploadRejected("Audio could not be decoded", 422)
+
+
+def is_silent(file_path, duration):
+    """True if every probed excerpt is below the silence threshold.
+
+    PROBE_SEGMENTS excerpts of PROBE_SECONDS are spread evenly across the
+    file, so recordings that open with a long pause still pass.
+    """
+    last_offset = max(duration - PROBE_SECONDS, 0)
+    for offset in sorted(set(np.linspace(0, last_offset, PROBE_SEGMENTS).round(2))):
+        try:
+            y, _ = librosa.load(file_path, sr=None, offset=offset, duration=PROBE_SECONDS)
+        except Exception as e:
+            logger.warning(f"Undecodable upload {file_path}: {e}")
+            raise UploadRejected("Audio could not be decoded", 422)
+        if len(y) and np.sqrt(np.mean(y ** 2)) >= SILENCE_RMS_THRESHOLD:
+            return False
+    return True
+
+
+def check_audio(file_path):
+    """Enforce header and duration limits and reject silent audio before feature extraction.
+
+    Sample rate and channel count are only checked when the header exposes
+    them (not for the librosa fallback in `probe_header`).
+    """
+    sample_rate, channels, duration = probe_header(file_path)
+    if sample_rate is not None and not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        raise UploadRejected(
+            f"Unsupported sample rate {sample_rate} Hz ({MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz allowed)", 422
+        )
+    if channels is not None and channels > MAX_CHANNELS:
+        raise UploadRejected(f"Too many channels ({channels}, maximum {MAX_CHANNELS})", 422)
+    if duration < MIN_AUDIO_SECONDS:
+        raise UploadRejected(f"Audio is too short (minimum {MIN_AUDIO_SECONDS}s)", 422)
+    if duration > MAX_AUDIO_SECONDS:
+        raise UploadRejected(f"Audio is too long (maximum {MAX_AUDIO_SECONDS}s)", 413)
+
+    if is_silent(file_path, duration):
+        raise UploadRejected("Audio is silent", 422)
+
+    return {"sample_rate": sample_rate, "channels": channels, "duration": duration}
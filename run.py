@@ -1,6 +1,7 @@
 from flask import Flask, redirect, url_for, session, request
 from flask_cors import CORS
 from app.routes import routes
+from app.config import MAX_CONTENT_LENGTH
 import os
 import logging
 import sys
@@ -23,6 +24,7 @@ def create_app():
     
     # Basic config
     app.secret_key = os.getenv("SECRET_KEY") or os.urandom(24)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH  # enforced while the body streams in
     CORS(app)  # allows your frontend to talk to backend
 
     # Register your routes (lessons, gigs, etc.)